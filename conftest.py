@@ -0,0 +1,21 @@
+"""Shared pytest configuration."""
+
+import os
+import sys
+
+
+def pytest_configure(config):
+    """Skip cache and bytecode writes for quick local runs.
+
+    Args:
+        config: The pytest config object.
+    """
+    if os.environ.get("FAST_TESTS"):
+        # Reason: for a suite this small, writing .pytest_cache and
+        # __pycache__ can cost more than the tests themselves. The
+        # last-failed/new-first plugins are what persist to disk.
+        for plugin_name in ("lfplugin", "nfplugin"):
+            plugin = config.pluginmanager.get_plugin(plugin_name)
+            if plugin is not None:
+                config.pluginmanager.unregister(plugin)
+        sys.dont_write_bytecode = True
@@ -1,6 +1,6 @@
 """Data models for context engineering system."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Dict, Optional
 from enum import Enum
 
@@ -55,12 +55,15 @@ class ValidationResult(BaseModel):
     errors: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
     fixed_code: Optional[str] = Field(default=None)
-    
+    _summary: str = PrivateAttr(default="")
+
     def get_summary(self) -> str:
-        """Get a summary of validation results."""
-        if self.success:
-            return "✅ Validation passed"
-        else:
-            error_count = len(self.errors)
-            warning_count = len(self.warnings)
-            return f"❌ Validation failed: {error_count} errors, {warning_count} warnings"
\ No newline at end of file
+        """Get a summary of validation results, formatted once and cached."""
+        if not self._summary:
+            if self.success:
+                self._summary = "✅ Validation passed"
+            else:
+                error_count = len(self.errors)
+                warning_count = len(self.warnings)
+                self._summary = f"❌ Validation failed: {error_count} errors, {warning_count} warnings"
+        return self._summary
\ No newline at end of file
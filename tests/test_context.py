@@ -2,39 +2,22 @@
 
 import pytest
 from pathlib import Path
-import tempfile
-import shutil
 
 from context import ContextLoader, ProjectContext, PRPRequest, ValidationResult
 
 
 class TestContextLoader:
     """Test the ContextLoader class."""
-    
+
     @pytest.fixture
-    def temp_project_dir(self):
-        """Create a temporary project directory with test files."""
-        temp_dir = tempfile.mkdtemp()
-        
-        # Create test files
-        (Path(temp_dir) / "CLAUDE.md").write_text("Test project rules")
-        (Path(temp_dir) / "PLANNING.md").write_text("Test planning docs")
-        (Path(temp_dir) / "TASK.md").write_text("Test tasks")
-        
-        # Create examples directory
-        examples_dir = Path(temp_dir) / "examples"
-        examples_dir.mkdir()
-        (examples_dir / "test_example.py").write_text("# Test example code")
-        
-        # Create PRPs directory
-        prps_dir = Path(temp_dir) / "PRPs"
-        prps_dir.mkdir()
-        (prps_dir / "test_prp.md").write_text("# Test PRP")
-        
-        yield temp_dir
-        
-        # Cleanup
-        shutil.rmtree(temp_dir)
+    def temp_project_dir(self, fs):
+        """Create an in-memory project directory with test files."""
+        fs.create_file("/proj/CLAUDE.md", contents="Test project rules")
+        fs.create_file("/proj/PLANNING.md", contents="Test planning docs")
+        fs.create_file("/proj/TASK.md", contents="Test tasks")
+        fs.create_file("/proj/examples/test_example.py", contents="# Test example code")
+        fs.create_file("/proj/PRPs/test_prp.md", contents="# Test PRP")
+        return "/proj"
     
     def test_load_project_context(self, temp_project_dir):
         """Test loading complete project context."""
@@ -82,15 +65,14 @@ class TestContextLoader:
         assert context.planning is None
         assert context.tasks is None
     
-    def test_default_claude_rules(self):
+    def test_default_claude_rules(self, tmp_path):
         """Test default CLAUDE.md rules when file doesn't exist."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            loader = ContextLoader(temp_dir)
-            context = loader.load_project_context()
-            
-            assert "Project Awareness" in context.claude_rules
-            assert "Code Structure" in context.claude_rules
-            assert "Testing" in context.claude_rules
+        loader = ContextLoader(str(tmp_path))
+        context = loader.load_project_context()
+
+        assert "Project Awareness" in context.claude_rules
+        assert "Code Structure" in context.claude_rules
+        assert "Testing" in context.claude_rules
 
 
 class TestProjectContext: